@@ -1,154 +1,443 @@
-import pickle
-import shutil
+import functools
+import numpy as np
 import pandas as pd
 import os
-import matplotlib.pyplot as plt
-from collections import Counter
+import re
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
 
 
 class MovieDBError(ValueError):
     pass
 
 
+# Column dtypes of the movies table; `genre` repeats a handful of values
+MOVIE_DTYPES = {'movie_id': 'int32', 'title': str, 'year': 'int32',
+                'genre': 'category', 'director_id': 'int32'}
+DIRECTOR_DTYPES = {'director_id': 'int32', 'given_name': str,
+                   'last_name': str}
+# Years that fit the `year` column
+YEAR_RANGE = np.iinfo(MOVIE_DTYPES['year'])
+
+# Bytes that `str.split()` treats as whitespace, and the non-ASCII
+# whitespace it also splits on, which the byte tokenizer does not handle
+_SPACE_BYTES = np.zeros(256, dtype=np.bool_)
+_SPACE_BYTES[[9, 10, 11, 12, 13, 28, 29, 30, 31, 32]] = True
+_UNICODE_SPACE = re.compile(
+    '[\x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]')
+
+
+def _csv_field(value):
+    # Quote a text field like `DataFrame.to_csv` does (QUOTE_MINIMAL), and
+    # also quote a bare '\r', which pandas writes unquoted
+    if not isinstance(value, str):
+        return '' if pd.isna(value) else str(value)
+    if ',' in value or '"' in value or '\n' in value or '\r' in value:
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+def _fast_to_csv(df, path):
+    # Same output as `df.to_csv(path, index=False)` for our int/text tables
+    # except for the quoting of '\r' above, formatting each column once
+    # instead of going through the generic writer
+    columns = []
+    for col, dtype in df.dtypes.items():
+        if pd.api.types.is_integer_dtype(dtype):
+            columns.append(['%d' % v for v in df[col].tolist()])
+        else:
+            columns.append([_csv_field(v) for v in df[col].tolist()])
+    with open(path, 'w', encoding='utf-8', newline='') as fh:
+        fh.write(','.join(_csv_field(c) for c in df.columns) + '\n')
+        fh.writelines(','.join(row) + '\n' for row in zip(*columns))
+
+
+def _csv_stamp(csv_path):
+    # Size and mtime of the CSV, stored in the Parquet snapshot taken of it
+    stat = os.stat(csv_path)
+    return f'{stat.st_size} {stat.st_mtime_ns}'.encode()
+
+
+def _read_table(csv_path, cache_path, dtype):
+    # Load from the typed Parquet snapshot of the CSV only if it was taken
+    # of exactly this file; copies and restores can carry older or equal
+    # mtimes, so a newer-than check is not enough
+    if pyarrow is not None:
+        stamp = _csv_stamp(csv_path)
+        try:
+            metadata = pyarrow.parquet.read_schema(cache_path).metadata
+            if (metadata or {}).get(b'csv_stamp') == stamp:
+                return pd.read_parquet(cache_path,
+                                       engine='pyarrow').astype(dtype)
+        except (FileNotFoundError, pyarrow.ArrowInvalid):
+            pass
+    # Only parse the known columns, with their dtypes given up front
+    df = pd.read_csv(csv_path, usecols=list(dtype), dtype=dtype)
+    if pyarrow is not None:
+        # Snapshot the parsed table for the next load. Writes only touch
+        # the CSV, which changes its stamp, so a stale snapshot is not used
+        table = pyarrow.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata(
+            {**table.schema.metadata, b'csv_stamp': stamp})
+        pyarrow.parquet.write_table(table, cache_path, compression='snappy')
+    return df
+
+
+@functools.lru_cache(maxsize=None)
+def _count_tokens_kernel():
+    # Build the Numba token counter on first use, so that numba is only
+    # imported when `token_freq` is called; None if numba is not installed
+    try:
+        from numba import njit, types
+        from numba.typed import Dict
+    except ImportError:
+        return None
+
+    @njit(cache=True)
+    def count_tokens(buf, is_space):
+        # Count whitespace-delimited tokens of `buf` in one pass, keyed by
+        # their FNV-1a hash. Returns the offset, length and count of every
+        # distinct token in order of first appearance, and False instead if
+        # two different tokens share a hash.
+        n = len(buf)
+        slots = Dict.empty(key_type=types.uint64, value_type=types.int64)
+        offsets = np.empty(n // 2 + 1, dtype=np.int64)
+        lengths = np.empty(n // 2 + 1, dtype=np.int64)
+        counts = np.zeros(n // 2 + 1, dtype=np.int64)
+        n_tokens = 0
+        i = 0
+        while i < n:
+            if is_space[buf[i]]:
+                i += 1
+                continue
+            start = i
+            h = np.uint64(14695981039346656037)
+            while i < n and not is_space[buf[i]]:
+                h = (h ^ np.uint64(buf[i])) * np.uint64(1099511628211)
+                i += 1
+            if h in slots:
+                j = slots[h]
+                if lengths[j] != i - start:
+                    return offsets, lengths, counts, False
+                for k in range(i - start):
+                    if buf[offsets[j] + k] != buf[start + k]:
+                        return offsets, lengths, counts, False
+                counts[j] += 1
+            else:
+                slots[h] = n_tokens
+                offsets[n_tokens] = start
+                lengths[n_tokens] = i - start
+                counts[n_tokens] = 1
+                n_tokens += 1
+        return (offsets[:n_tokens], lengths[:n_tokens], counts[:n_tokens],
+                True)
+
+    return count_tokens
+
+
 class MovieDB:
     def __init__(self, data_dir):
         # Initialize directories
         self.data_dir = data_dir
         self.movies_dir = os.path.join(data_dir, 'movies.csv')
         self.directors_dir = os.path.join(data_dir, 'directors.csv')
-        self.init_dirs()
+        # Parquet snapshots of the CSV files, used when pyarrow is available
+        self.movies_cache = os.path.join(data_dir, 'movies.parquet')
+        self.directors_cache = os.path.join(data_dir, 'directors.parquet')
+        self._load_from_disk()
 
     # Helper Functions
-    def init_dirs(self):
+    def _load_from_disk(self):
         try:
-            self.movies = pd.read_csv(self.movies_dir)
+            self.movies = _read_table(self.movies_dir, self.movies_cache,
+                                      MOVIE_DTYPES)
             self.read_directors_csv()
         except FileNotFoundError:
             # Create tables and files if non-existent
             self.movies = pd.DataFrame(
-                columns=['movie_id', 'title', 'year', 'genre', 'director_id'])
+                columns=['movie_id', 'title', 'year', 'genre', 'director_id']
+            ).astype(MOVIE_DTYPES)
             self.directors = pd.DataFrame(
-                columns=['director_id', 'given_name',
-                         'last_name', 'director'], dtype=int)
-            self.movies.to_csv(self.movies_dir, index=False)
+                columns=['director_id', 'given_name', 'last_name']
+            ).astype(DIRECTOR_DTYPES)
+            self._director_index = {}
+            self._next_director_id = 1
+            self.write_movies_csv()
             self.write_directors_csv()
+        self.index_movies()
+        self._merged = None
+
+    def write_movies_csv(self):
+        _fast_to_csv(self.movies[list(MOVIE_DTYPES)], self.movies_dir)
 
     def write_directors_csv(self):
-        self.directors.iloc[:, :-1].to_csv(self.directors_dir, index=False)
+        _fast_to_csv(self.directors, self.directors_dir)
 
     def read_directors_csv(self):
-        d_temp = pd.read_csv(self.directors_dir, dtype={'director_id': int})
-        d_temp['director'] = d_temp['last_name'] + ', ' + d_temp['given_name']
-        self.directors = d_temp
+        self.directors = _read_table(self.directors_dir,
+                                     self.directors_cache, DIRECTOR_DTYPES)
+        self.index_directors()
+
+    def index_directors(self):
+        # Map lowercased (last_name, given_name) to `director_id`
+        self._director_index = dict(zip(
+            zip(self.directors['last_name'].str.lower(),
+                self.directors['given_name'].str.lower()),
+            self.directors['director_id'].astype(int).tolist()))
+        self._next_director_id = self._next_id(self.directors['director_id'])
+
+    def directors_with_name(self):
+        # Directors with the display name used by the statistics
+        return self.directors.assign(
+            director=self.directors['last_name'].str.cat(
+                self.directors['given_name'], sep=', '))
+
+    def merged_movies(self):
+        # Movies joined with their directors; reset whenever either changes
+        if self._merged is None:
+            self._merged = pd.merge(self.movies, self.directors_with_name(),
+                                    how='left', on='director_id')
+        return self._merged
+
+    def index_movies(self):
+        # Lowercased `title`/`genre` columns for searching (not stored in
+        # movies.csv) and the duplicate keys
+        self.movies['title_lower'] = self.movies['title'].str.lower()
+        self.movies['genre_lower'] = self.movies['genre'].str.lower()
+        self._movie_key_set = set(self._movie_keys(self.movies))
+        self._next_movie_id = self._next_id(self.movies['movie_id'])
+
+    @staticmethod
+    def _next_id(ids):
+        return int(ids.max()) + 1 if len(ids) else 1
+
+    @staticmethod
+    def _concat_rows(table, rows):
+        new_rows = pd.DataFrame(rows, columns=table.columns)
+        if len(table) == 0:
+            return new_rows
+        return pd.concat([table, new_rows], ignore_index=True)
+
+    def _append_directors(self, new_directors):
+        self.directors = self._concat_rows(
+            self.directors, new_directors).astype(DIRECTOR_DTYPES)
+        self._merged = None
+
+    def _append_movies(self, new_movies):
+        new_movies = new_movies.assign(
+            title_lower=new_movies['title'].str.lower(),
+            genre_lower=new_movies['genre'].str.lower())
+        # Re-apply dtypes since concat drops mismatched categories
+        self.movies = self._concat_rows(
+            self.movies, new_movies).astype(MOVIE_DTYPES)
+        self._merged = None
+
+    @staticmethod
+    def _normalize_director(director):
+        # Collapse runs of whitespace and the space before the comma, so that
+        # 'Doe , John' is stored as 'Doe, John'
+        return ' '.join(director.split()).replace(' ,', ',')
+
+    def _parse_director(self, director):
+        # Normalize a single director, which must be 'last_name, given_name'
+        director = self._normalize_director(director)
+        if ', ' not in director:
+            raise ValueError(
+                f"director {director!r} is not 'last_name, given_name'")
+        return director
+
+    def _resolve_directors(self, directors):
+        # Look up the normalized 'last_name, given_name' `directors`,
+        # numbering the unseen ones from `_next_director_id` without
+        # registering them yet. Returns the `director_id` of every row and
+        # the new director rows, see `_register_directors`.
+        names = directors.str.split(', ', n=1, expand=True)
+        names.columns = ['last_name', 'given_name']
+        names['key'] = list(zip(names['last_name'].str.lower(),
+                                names['given_name'].str.lower()))
+        new_d = names[[key not in self._director_index
+                       for key in names['key']]].drop_duplicates('key')
+        new_d.insert(0, 'director_id', range(
+            self._next_director_id, self._next_director_id + len(new_d)))
+        new_ids = dict(zip(new_d['key'], new_d['director_id'].tolist()))
+        director_ids = [self._director_index[key]
+                        if key in self._director_index else new_ids[key]
+                        for key in names['key']]
+        return director_ids, new_d.astype(DIRECTOR_DTYPES)
+
+    def _register_directors(self, new_d):
+        # Add the rows returned by `_resolve_directors` to the table
+        self._next_director_id += len(new_d)
+        self._director_index.update(
+            zip(new_d['key'], new_d['director_id'].tolist()))
+        if len(new_d) != 0:
+            self._append_directors(new_d)
 
     def add_director(self, director):
-        self.read_directors_csv()
-        director = ' '.join(director.split()).replace(' ,', ',')
-        new_d = {'director': director}
-        new_d['last_name'], new_d['given_name'] = director.split(', ', 1)
-        if len(self.directors) == 0:
-            new_d['director_id'] = 1
-            self.directors = self.directors.append(new_d, ignore_index=True)
-        else:
-            # If director is already in list, return the `director_id`
-            d_list = list(self.directors['director'].str.lower().values)
-            if director.lower() in d_list:
-                return self.directors['director_id'].iloc[
-                    d_list.index(director.lower())]
-            # Add director if not in list
-            else:
-                # Set new director_id to last_id + 1
-                last_id = self.directors['director_id'].iloc[-1]
-                new_d['director_id'] = int(last_id+1)
-                self.directors = self.directors.append(new_d,
-                                                       ignore_index=True)
-        self.write_directors_csv()
-        return self.directors['director_id'].iloc[-1]
+        # Register `director` if it is new; returns its `director_id`
+        director_ids, new_d = self._resolve_directors(
+            pd.Series([self._parse_director(director)]))
+        self._register_directors(new_d)
+        if len(new_d) != 0:
+            self.write_directors_csv()
+        return director_ids[0]
+
+    @staticmethod
+    def _movie_keys(table):
+        # Case-insensitive identity of each movie, for duplicate checks
+        return zip(table['title'].str.lower(), table['year'].tolist(),
+                   table['genre'].str.lower(), table['director_id'].tolist())
 
     def is_dup(self, movie):
-        dup_check = (self.movies['title'].str.lower() +
-                     self.movies['year'].astype(str) +
-                     self.movies['genre'].str.lower() +
-                     self.movies['director_id'].astype(str))
-        search_term = ''.join(str(v).lower() for v in movie.values())
-        return search_term in dup_check.values
+        # `movie` holds the title, year, genre and director_id of a movie
+        return (movie['title'].lower(), movie['year'], movie['genre'].lower(),
+                movie['director_id']) in self._movie_key_set
+
+    def _insert_movies(self, new, directors):
+        # Insert the `new` title/year/genre rows, directed by the normalized
+        # 'last_name, given_name' `directors`, registering the unseen
+        # directors in one go. Returns the new movie ids and a mask of the
+        # rows skipped as duplicates.
+        director_ids, new_d = self._resolve_directors(directors)
+
+        # Cast the rows before touching any state, so that a failed cast
+        # leaves no partial insert; callers check the years against
+        # YEAR_RANGE, as the cast would wrap them around
+        movies = pd.DataFrame({
+            'title': new['title'].str.strip(),
+            'year': new['year'],
+            'genre': new['genre'].str.strip(),
+            'director_id': director_ids}).astype(
+            {col: MOVIE_DTYPES[col] for col in
+             ['title', 'year', 'genre', 'director_id']})
+
+        # Drop movies already in the database or earlier in the batch
+        movie_keys = pd.Series(list(self._movie_keys(movies)),
+                               index=movies.index)
+        in_db = np.array([key in self._movie_key_set
+                          for key in movie_keys], dtype=bool)
+        dup = movie_keys.duplicated().to_numpy() | in_db
+        movies = movies[~dup]
+        movie_ids = list(range(self._next_movie_id,
+                               self._next_movie_id + len(movies)))
+        movies.insert(0, 'movie_id', movie_ids)
+
+        self._register_directors(new_d)
+        self._next_movie_id += len(movies)
+        self._movie_key_set.update(movie_keys[movies.index])
+        self._append_movies(movies)
+        return movie_ids, dup
+
+    @staticmethod
+    def _count_by_year(table, col):
+        # Count movies per (`col`, year) in one pass and nest by `col`
+        counts = table.groupby([col, 'year'], observed=True).size()
+        stats = {}
+        for (key, year), count in counts.to_dict().items():
+            stats.setdefault(key, {})[year] = count
+        return stats
 
     # Main Functions
 
+    def reload(self):
+        # Re-read both tables, e.g. after the files were changed externally
+        self._load_from_disk()
+
     def add_movie(self, title, year, genre, director):
-        self.init_dirs()
-        movie = {'title': title.strip(), 'year': year, 'genre': genre.strip()}
-        movie['director_id'] = int(self.add_director(director))
-        if len(self.movies) == 0:
-            movie['movie_id'] = 1
-            self.movies = self.movies.append(movie, ignore_index=True)
-        else:
-            if self.is_dup(movie):
-                raise MovieDBError
-            else:
-                last_id = self.movies['movie_id'].iloc[-1]
-                movie['movie_id'] = last_id + 1
-                self.movies = self.movies.append(movie, ignore_index=True)
-        self.movies.to_csv(self.movies_dir, index=False)
-        return self.movies['movie_id'].iloc[-1]
+        if type(year) is not int or \
+                not YEAR_RANGE.min <= year <= YEAR_RANGE.max:
+            raise ValueError(f"year {year!r} is not an int between "
+                             f"{YEAR_RANGE.min} and {YEAR_RANGE.max}")
+        director = self._parse_director(director)
+        next_director_id = self._next_director_id
+        movie_ids, dup = self._insert_movies(
+            pd.DataFrame({'title': [title], 'year': [year],
+                          'genre': [genre]}),
+            pd.Series([director]))
+        if dup[0]:
+            raise MovieDBError
+        # directors.csv only changes when the movie brought a new director
+        if self._next_director_id != next_director_id:
+            self.write_directors_csv()
+        self.write_movies_csv()
+        return movie_ids[0]
 
     def add_movies(self, movie_list):
-        i = 0
+        movie_list = list(movie_list)
+        keys = ['director', 'genre', 'title', 'year']
+        batch = pd.DataFrame(movie_list, columns=keys, dtype=object)
+
+        # Validate the whole batch: exactly `keys` with the expected types,
+        # a year that fits the `year` column and a 'last_name, given_name'
+        # director
+        valid = pd.Series([len(movie) == len(keys) for movie in movie_list],
+                          index=batch.index, dtype=bool)
+        for key, key_type in zip(keys, [str, str, str, int]):
+            valid &= batch[key].map(type).eq(key_type)
+        valid[valid] = batch.loc[valid, 'year'].between(YEAR_RANGE.min,
+                                                        YEAR_RANGE.max)
+        directors = batch.loc[valid, 'director'].map(
+            self._normalize_director)
+        valid[valid] = directors.str.contains(', ', regex=False)
+        new = batch[valid]
+        dup = pd.Series(False, index=batch.index)
         movie_ids = []
+        next_director_id = self._next_director_id
+        if len(new) != 0:
+            movie_ids, dup[new.index] = self._insert_movies(
+                new, directors[new.index])
 
-        def i_message(i):
-            return (f"Warning: movie index {i} has invalid or incomplete "
-                    "information. Skipping...")
-        for movie in movie_list:
-            keys = ['director', 'genre', 'title', 'year']
-            if sorted(movie.keys()) != keys:
-                print(i_message(i))
-            elif [type(movie[key]) for key in keys] != [str, str, str, int]:
-                print(i_message(i))
-            elif ', ' not in movie['director']:
-                print(i_message(i))
+        for i in batch.index[~valid | dup]:
+            if not valid[i]:
+                print(f"Warning: movie index {i} has invalid or incomplete "
+                      "information. Skipping...")
             else:
-                try:
-                    movie_ids += [self.add_movie(movie['title'],
-                                                 movie['year'],
-                                                 movie['genre'],
-                                                 movie['director'])]
-                except MovieDBError:
-                    print(f"Warning: movie {movie['title']} is already in the"
-                          " database. Skipping...")
-            i += 1
+                print(f"Warning: movie {movie_list[i]['title']} is already "
+                      "in the database. Skipping...")
+        # Persist the whole batch at once, rewriting directors.csv only if
+        # the batch brought new directors
+        if self._next_director_id != next_director_id:
+            self.write_directors_csv()
+        if movie_ids:
+            self.write_movies_csv()
         return movie_ids
 
     def delete_movie(self, movie_id):
-        self.init_dirs()
         if movie_id not in self.movies['movie_id'].values:
             raise MovieDBError
-        self.movies = self.movies[self.movies['movie_id'] != movie_id]
-        self.movies.to_csv(self.movies_dir, index=False)
+        is_deleted = self.movies['movie_id'] == movie_id
+        self._movie_key_set.difference_update(
+            self._movie_keys(self.movies[is_deleted]))
+        self.movies = self.movies[~is_deleted]
+        # Ids continue from the largest one left, as when the table is
+        # loaded from disk
+        if movie_id == self._next_movie_id - 1:
+            self._next_movie_id = self._next_id(self.movies['movie_id'])
+        self._merged = None
+        self.write_movies_csv()
 
     def search_movies(self, title=None, year=None, genre=None,
                       director_id=None):
-        self.init_dirs()
         if [title, year, genre, director_id] == [None]*4:
             raise MovieDBError
         else:
-            search_table = pd.read_csv(self.movies_dir).\
-                apply(lambda x: x.str.lower() if(x.dtype == 'object') else x)
-            filters = {'title': None if title is None else title.lower().
-                       strip(),
-                       'genre': None if genre is None else genre.lower().
-                       strip(),
+            filters = {'title_lower': None if title is None else
+                       title.lower().strip(),
+                       'genre_lower': None if genre is None else
+                       genre.lower().strip(),
                        'year': year,
                        'director_id': director_id}
-            for k, v in filters.items():
-                if v is not None:
-                    search_table = search_table[search_table[k] == v]
+            filters = {k: v for k, v in filters.items() if v is not None}
+            # Evaluate all filters as one expression (numexpr if installed)
+            expr = ' and '.join(f'{k} == @{k}' for k in filters)
+            search_table = self.movies.query(expr, local_dict=filters)
         return search_table['movie_id'].tolist()
 
     def export_data(self):
-        self.init_dirs()
-        d_temp = pd.merge(self.movies, self.directors, how='left',
-                          on='director_id').\
+        d_temp = self.merged_movies().\
             rename(columns={'given_name': 'director_given_name',
                             'last_name': 'director_last_name'}).\
             sort_values('movie_id')
@@ -157,19 +446,12 @@ class MovieDB:
         return d_temp[ret_cols]
 
     def generate_statistics(self, stat):
-        self.init_dirs()
         if stat == 'movie':
-            return self.movies.groupby('year')['movie_id'].count().to_dict()
+            return self.movies.groupby('year').size().to_dict()
         elif stat == 'genre':
-            return {genre: self.movies[self.movies['genre'] == genre].
-                    groupby('year')['movie_id'].count().to_dict() for genre in
-                    self.movies['genre'].unique()}
+            return self._count_by_year(self.movies, 'genre')
         elif stat == 'director':
-            df_temp = pd.merge(self.movies, self.directors, how='left',
-                               on='director_id')
-            return {director: df_temp[df_temp['director'] == director].
-                    groupby('year')['movie_id'].count().to_dict() for director
-                    in df_temp['director'].unique()}
+            return self._count_by_year(self.merged_movies(), 'director')
         elif stat == 'all':
             return {s: self.generate_statistics(s) for s in
                     ['movie', 'genre', 'director']}
@@ -177,7 +459,7 @@ class MovieDB:
             raise MovieDBError
 
     def plot_statistics(self, stat):
-        self.init_dirs()
+        import matplotlib.pyplot as plt
         if stat == 'movie':
             movie_dict = self.generate_statistics('movie')
             movie_dict = {k: v for k, v in sorted(movie_dict.items(),
@@ -202,17 +484,15 @@ class MovieDB:
             plt.show()
             return ax
         elif stat == 'director':
-            director_dict = self.generate_statistics('director')
-            temp_df = pd.merge(self.movies, self.directors, how='left',
-                               on='director_id')
-            top_5 = temp_df.groupby(['director', 'director_id'])['movie_id'].\
-                count().reset_index().sort_values(['movie_id', 'director'],
-                                                  ascending=[False, True]).\
-                head(5)['director'].tolist()            
+            counts = self.merged_movies().\
+                groupby(['director', 'year']).size().unstack(fill_value=0)
+            # Ties in the movie count are broken by director name
+            top_5 = counts.sum(axis=1).nlargest(5).index.tolist()
             plt.rcParams['figure.figsize'] = [15, 10]
             for director in top_5:
-                plt.plot(director_dict[director].keys(),
-                         director_dict[director].values(),
+                director_counts = counts.loc[director]
+                director_counts = director_counts[director_counts > 0]
+                plt.plot(director_counts.index, director_counts.values,
                          'o-', label=director)
             plt.xlabel('year')
             plt.ylabel('movies')
@@ -224,6 +504,15 @@ class MovieDB:
             raise MovieDBError
 
     def token_freq(self):
-        self.init_dirs()
-        search_list = ' '.join(self.movies['title'].values).lower().split()
-        return dict(Counter(search_list))
+        count_tokens = _count_tokens_kernel()
+        if count_tokens is not None:
+            search_text = ' '.join(self.movies['title_lower'].values)
+            if not _UNICODE_SPACE.search(search_text):
+                data = search_text.encode('utf-8')
+                offsets, lengths, counts, ok = count_tokens(
+                    np.frombuffer(data, dtype=np.uint8), _SPACE_BYTES)
+                if ok:
+                    return {data[o:o + n].decode('utf-8'): int(c)
+                            for o, n, c in zip(offsets, lengths, counts)}
+        return self.movies['title_lower'].str.split().explode().\
+            value_counts().to_dict()